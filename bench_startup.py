@@ -0,0 +1,51 @@
+import os
+import sys
+import subprocess
+import time
+
+# 콜드 스타트 지연 측정
+#   매 측정마다 새 파이썬 프로세스를 띄워 import/모델 로딩 시간을 잼
+#   사용법: python bench_startup.py [반복 횟수]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CASES = {
+    # 창을 띄우기 전까지 필요한 import (모델 로딩 없음)
+    "import engine, ui": "import engine, ui",
+    # 창이 그려질 때까지 (디스플레이가 없으면 건너뜀)
+    "time-to-window": ("import engine, ui; u = ui.FaceRecognitionUI(engine.FaceRecognitionEngine()); "
+                       "u.window.update(); u.window.destroy()"),
+    # 엔진 생성 (로그 핸들러 설정 포함)
+    "FaceRecognitionEngine()": "import engine; engine.FaceRecognitionEngine()",
+    # 첫 사용 시 모델 로딩 (dlib + face_recognition)
+    "get_models()": "import engine; engine.get_models()",
+}
+
+def measure(code, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=HERE,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"Benchmark case failed: {code}\n{result.stderr}")
+        timings.append(elapsed)
+    return timings
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = min(measure("pass", repeat))
+    print(f"[bench_startup] python interpreter: {baseline * 1000:.1f} ms (subtracted below)")
+    for name, code in CASES.items():
+        try:
+            timings = measure(code, repeat)
+        except RuntimeError as e:
+            print(f"[bench_startup] {name}: skipped ({e.args[0].splitlines()[-1]})")
+            continue
+        best = (min(timings) - baseline) * 1000
+        mean = (sum(timings) / len(timings) - baseline) * 1000
+        print(f"[bench_startup] {name}: best={best:.1f} ms, mean={mean:.1f} ms")
+
+if __name__ == "__main__":
+    main()
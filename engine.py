@@ -1,35 +1,105 @@
 import os
 import shutil
 import queue
-import face_recognition
+import threading
+import time
 import concurrent.futures
-from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageTk
-import traceback
+from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import logging
-import psutil
 import numpy as np
 
-# 로거 설정
+# 로거 설정 (파일 핸들러는 import 시점이 아니라 configure_logging()에서 추가)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-file_handler = logging.FileHandler('log.txt', encoding='utf-8')
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+
+def configure_logging(log_path='log.txt'):
+    # 여러 번 호출되어도 핸들러는 한 번만 추가
+    if any(isinstance(h, logging.FileHandler) for h in logger.handlers):
+        return
+    formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+    file_handler = logging.FileHandler(log_path, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+# ----------------------------------------------------------------------
+# 모델 레지스트리 (프로세스당 1개)
+#   face_recognition은 import 시점에 dlib 모델 파일(detector/predictor/encoder)을
+#   로드하므로, 처음 사용할 때까지 import를 미루고 여기서 한 번만 로드
+#   (로드된 모델 인스턴스는 face_recognition 모듈 안에 보관됨)
+# ----------------------------------------------------------------------
+_model_registry = None
+_model_lock = threading.Lock()
+_process = None
+
+def get_models():
+    global _model_registry
+    if _model_registry is not None:
+        return _model_registry
+    with _model_lock:
+        if _model_registry is None:
+            start = time.perf_counter()
+            try:
+                import dlib
+                import face_recognition
+            except (ImportError, SystemExit) as e:
+                # face_recognition은 face_recognition_models가 없으면 quit()을 호출함 (SystemExit)
+                # => 워커 스레드의 일반 예외 처리 경로로 보고되도록 RuntimeError로 변환
+                logger.exception("[get_models] Failed to load face recognition models")
+                raise RuntimeError(
+                    "Failed to load face recognition models. "
+                    "Install dlib, face_recognition and face_recognition_models "
+                    "(pip install -r requirements.txt)."
+                ) from e
+            registry = {
+                "face_recognition": face_recognition,
+                "dlib_use_cuda": dlib.DLIB_USE_CUDA,
+            }
+            logger.info(f"[get_models] Models loaded in {time.perf_counter() - start:.2f}s (DLIB_USE_CUDA={dlib.DLIB_USE_CUDA})")
+            _model_registry = registry
+    return _model_registry
+
+def get_face_recognition():
+    return get_models()["face_recognition"]
+
+def _current_process():
+    global _process
+    if _process is None:
+        import psutil
+        _process = psutil.Process(os.getpid())
+    return _process
 
 class FaceRecognitionEngine:
     def __init__(self):
+        configure_logging()
         logger.info("Initializing FaceRecognitionEngine")
         self.unknown_threshold = 0.45
+        self.identify_all_faces = False
+        self.blur_unmatched_faces = False
+        self.link_group_files = False
         self.results_queue = queue.Queue()
 
     def set_threshold(self, value: float):
         logger.info(f"[set_threshold] Setting threshold to {value}")
         self.unknown_threshold = value
 
+    def set_identify_all_faces(self, enabled: bool, blur_unmatched: bool = False, link_files: bool = False):
+        # enabled: 단체사진의 모든 얼굴을 식별 (기본은 가장 큰 얼굴만)
+        # blur_unmatched: 매칭되지 않은 얼굴만 블러 처리
+        # link_files: output_group에 복사 대신 하드링크 (실패 시 복사)
+        logger.info(f"[set_identify_all_faces] enabled={enabled}, blur_unmatched={blur_unmatched}, link_files={link_files}")
+        self.identify_all_faces = enabled
+        self.blur_unmatched_faces = blur_unmatched
+        self.link_group_files = link_files
+
+    def warm_up(self):
+        # 백그라운드 스레드에서 호출하여 첫 이미지 처리 전에 모델을 미리 로드
+        logger.info("[warm_up] Loading models")
+        return get_models()
+
     def _find_closest_match(self, target_encoding, known_faces):
         logger.info(f"[_find_closest_match] Called with {len(known_faces)} known faces.")
         try:
+            face_recognition = get_face_recognition()
             distances = face_recognition.face_distance(known_faces, target_encoding)
             min_idx = distances.argmin()
             logger.debug(f"[_find_closest_match] Found min_idx={min_idx}, distance={distances[min_idx]}")
@@ -38,9 +108,70 @@ class FaceRecognitionEngine:
             logger.exception("Error in _find_closest_match")
             return 0, 999.0  # 임의로 큰 거리 반환
 
+    def _find_all_matches(self, encodings, known_faces, known_names):
+        # 모든 얼굴 인코딩을 한 번의 벡터 연산으로 갤러리와 비교
+        # distances[i, j] = i번째 얼굴과 j번째 known 얼굴 사이의 거리
+        logger.info(f"[_find_all_matches] Called with {len(encodings)} faces, {len(known_faces)} known faces.")
+        if len(encodings) == 0 or len(known_faces) == 0:
+            return [("unknown", 999.0)] * len(encodings)
+        try:
+            targets = np.asarray(encodings)
+            gallery = np.asarray(known_faces)
+            # ||a-b||² = ||a||² + ||b||² - 2·a·b  => (얼굴 수 x known 수) 배열만 생성
+            sq_dist = (np.einsum("ij,ij->i", targets, targets)[:, np.newaxis]
+                       + np.einsum("ij,ij->i", gallery, gallery)[np.newaxis, :]
+                       - 2.0 * targets @ gallery.T)
+            distances = np.sqrt(np.clip(sq_dist, 0.0, None))
+            min_idx = distances.argmin(axis=1)
+            min_dist = distances[np.arange(len(targets)), min_idx]
+            matches = []
+            for idx, dist in zip(min_idx, min_dist):
+                if dist < self.unknown_threshold and idx < len(known_names):
+                    matches.append((known_names[idx], float(dist)))
+                else:
+                    matches.append(("unknown", float(dist)))
+            logger.debug(f"[_find_all_matches] matches={matches}")
+            return matches
+        except Exception as e:
+            logger.exception("Error in _find_all_matches")
+            return [("unknown", 999.0)] * len(encodings)
+
+    def _blur_regions(self, pil_image, boxes, radius=15):
+        # 얼굴마다 crop/paste 하지 않고, 얼굴들을 감싸는 영역(union box)만
+        # 한 번 블러한 뒤 마스크를 통해 얼굴 부분만 합성
+        if not boxes:
+            return pil_image
+        width, height = pil_image.size
+        union_left = max(0, min(left for _, _, _, left in boxes))
+        union_top = max(0, min(top for top, _, _, _ in boxes))
+        union_right = min(width, max(right for _, right, _, _ in boxes) + 1)
+        union_bottom = min(height, max(bottom for _, _, bottom, _ in boxes) + 1)
+        if union_right <= union_left or union_bottom <= union_top:
+            return pil_image
+
+        mask = Image.new("L", (union_right - union_left, union_bottom - union_top), 0)
+        mask_draw = ImageDraw.Draw(mask)
+        for top, right, bottom, left in boxes:
+            mask_draw.rectangle(((left - union_left, top - union_top),
+                                 (right - union_left, bottom - union_top)), fill=255)
+        region = pil_image.crop((union_left, union_top, union_right, union_bottom))
+        blurred = region.filter(ImageFilter.GaussianBlur(radius=radius))
+        pil_image.paste(blurred, (union_left, union_top), mask)
+        return pil_image
+
+    def _copy_or_link(self, src, dst):
+        if self.link_group_files:
+            try:
+                if os.path.exists(dst):
+                    os.remove(dst)
+                os.link(src, dst)
+                return
+            except OSError:
+                logger.warning(f"[_copy_or_link] Hard link failed, falling back to copy: {dst}")
+        shutil.copy(src, dst)
+
     def _log_memory_usage(self, prefix: str):
-        process = psutil.Process(os.getpid())
-        mem_info = process.memory_info()
+        mem_info = _current_process().memory_info()
         rss_mb = mem_info.rss / 1024 / 1024
         vms_mb = mem_info.vms / 1024 / 1024
         logger.info(f"[MEMORY] {prefix} RSS={rss_mb:.2f}MB, VMS={vms_mb:.2f}MB")
@@ -64,7 +195,7 @@ class FaceRecognitionEngine:
                 corrupted_path = os.path.join(output_path_unknown, "corrupted_files")
                 os.makedirs(corrupted_path, exist_ok=True)
                 shutil.copy(file_path, os.path.join(corrupted_path, file))
-                return file, "unknown", None
+                return file, "unknown", None, []
 
             # ----------------------------------------------------------------
             # (추가) PIL로 원본 이미지를 열어서 리사이즈한 뒤에
@@ -80,13 +211,16 @@ class FaceRecognitionEngine:
                     image_array = np.array(im)
             except Exception as e:
                 logger.exception(f"[process_single_image] Reopen & resize error: {file}")
-                return file, "unknown", None
+                return file, "unknown", None, []
+
+            face_recognition = get_face_recognition()
 
             # 이제 face_recognition.load_image_file() 대신
             # 바로 image_array를 넘김
             # face_recognition.face_locations() 등도 array를 직접 처리 가능
             face_locations = face_recognition.face_locations(image_array)
-            encodings = face_recognition.face_encodings(image_array)
+            # 검출된 위치를 그대로 넘겨 face_locations와 encodings의 순서를 맞춤
+            encodings = face_recognition.face_encodings(image_array, known_face_locations=face_locations)
 
             logger.debug(f"[process_single_image] face_locations: {face_locations}")
             logger.debug(f"[process_single_image] encodings found: {len(encodings)}")
@@ -96,6 +230,8 @@ class FaceRecognitionEngine:
             font = ImageFont.load_default()
 
             matched_person = "unknown"
+            face_records = []
+            group_names = None  # all-faces 모드에서 매칭된 사람 목록
             if not encodings:
                 logger.info("[process_single_image] No face detected, copying to unknown folder.")
                 shutil.copy(file_path, os.path.join(output_path_unknown, file))
@@ -108,6 +244,30 @@ class FaceRecognitionEngine:
                 top, right, bottom, left = face_locations[0]
                 draw.rectangle(((left, top), (right, bottom)), outline="red", width=5)
                 draw.text((left, bottom + 5), matched_person, fill="red", font=font)
+                face_records.append({"location": face_locations[0], "name": matched_person, "distance": float(dist)})
+            elif self.identify_all_faces:
+                logger.info(f"[process_single_image] Multiple faces detected (all-faces mode): {len(encodings)}")
+                matches = self._find_all_matches(encodings, known_faces, known_names)
+                for location, (name, dist) in zip(face_locations, matches):
+                    face_records.append({"location": location, "name": name, "distance": dist})
+
+                if self.blur_unmatched_faces:
+                    self._blur_regions(pil_image, [r["location"] for r in face_records if r["name"] == "unknown"])
+
+                for record in face_records:
+                    top, right, bottom, left = record["location"]
+                    draw.rectangle(((left, top), (right, bottom)), outline="red", width=5)
+                    draw.text((left, bottom + 5), record["name"], fill="red", font=font)
+
+                # 중복 제거 (같은 사람이 두 번 매칭될 수 있음), 검출 순서 유지
+                group_names = list(dict.fromkeys(r["name"] for r in face_records if r["name"] != "unknown"))
+                if group_names:
+                    # 가장 큰 얼굴의 이름을 대표로 사용 (썸네일/로그용)
+                    main_record = max(
+                        (r for r in face_records if r["name"] != "unknown"),
+                        key=lambda r: (r["location"][1] - r["location"][3]) * (r["location"][2] - r["location"][0])
+                    )
+                    matched_person = main_record["name"]
             else:
                 logger.info(f"[process_single_image] Multiple faces detected: {len(encodings)}")
                 largest_area = 0
@@ -137,21 +297,31 @@ class FaceRecognitionEngine:
                 ratio_threshold = 0.3  # 두 번째 얼굴 면적이 최대 얼굴의 30% 이하이면 단일로 침
                 is_single_dominant = (len(face_locations) > 1 and second_largest < (largest_area * ratio_threshold))
 
+                # 메인 얼굴 외에는 마스크 한 장으로 한 번에 블러
+                self._blur_regions(pil_image, [loc for i, loc in enumerate(face_locations) if i != main_index])
                 for i, (top, right, bottom, left) in enumerate(face_locations):
                     draw.rectangle(((left, top), (right, bottom)), outline="red", width=5)
-                    if i != main_index:
-                        face_region = pil_image.crop((left, top, right, bottom))
-                        blurred_face = face_region.filter(ImageFilter.GaussianBlur(radius=15))
-                        pil_image.paste(blurred_face, (left, top, right, bottom))
-                    else:
+                    if i == main_index:
                         draw.text((left, bottom + 5), matched_person, fill="red", font=font)
+                face_records.append({"location": face_locations[main_index], "name": matched_person, "distance": float(dist)})
 
             # -------------------------------------------------------------------
             # 사람 이름별 폴더 생성 및 원본 파일 복사
             #    * (수정) 여러 얼굴이 있지만 한 명이 압도적으로 크면 "단일 얼굴" 폴더에 저장
             #    * 그 외 진짜 단체사진일 경우 -> output_group
+            #    * all-faces 모드: 매칭된 모든 사람의 output_group 폴더에 저장
             # -------------------------------------------------------------------
-            if matched_person != "unknown":
+            if group_names is not None:
+                if group_names:
+                    for name in group_names:
+                        output_group_path = os.path.join(base_output_folder, "output_group", name)
+                        os.makedirs(output_group_path, exist_ok=True)
+                        logger.info(f"[process_single_image] Placing original (all-faces) in {output_group_path}")
+                        self._copy_or_link(file_path, os.path.join(output_group_path, file))
+                else:
+                    logger.info("[process_single_image] No face matched (all-faces), copying to unknown folder.")
+                    shutil.copy(file_path, os.path.join(output_path_unknown, file))
+            elif matched_person != "unknown":
                 if len(face_locations) > 1 and not is_single_dominant:
                     # 실제로 여러 얼굴
                     output_group_path = os.path.join(base_output_folder, "output_group", matched_person)
@@ -171,11 +341,11 @@ class FaceRecognitionEngine:
             resized.thumbnail((600, 400), Image.Resampling.LANCZOS)
 
             logger.info(f"[process_single_image] Returning thumbnail for file: {file}, matched_person={matched_person}")
-            return file, matched_person, resized
+            return file, matched_person, resized, face_records
 
         except Exception as e:
             logger.exception(f"[process_single_image] Error processing {file}")
-            return file, "unknown", None
+            return file, "unknown", None, []
         finally:
             self._log_memory_usage("Finally (process_single_image)")
 
@@ -183,6 +353,7 @@ class FaceRecognitionEngine:
         logger.info(f"[process_images_in_background] Called with dataset={dataset_folder}, base_output={base_output_folder}, known_images={known_images_folder}")
         self._log_memory_usage("Start of process_images_in_background")
         try:
+            face_recognition = get_face_recognition()
             logger.info("[process_images_in_background] Scanning known folder...")
             known_faces = []
             known_names = []
@@ -230,16 +401,20 @@ class FaceRecognitionEngine:
                     future_map[ft] = f
 
                 for ft in concurrent.futures.as_completed(future_map):
-                    file, matched_person, thumb = ft.result()
+                    file, matched_person, thumb, face_records = ft.result()
                     done_count += 1
                     logger.info(f"[process_images_in_background] Completed {file}. matched_person={matched_person}")
-                    if matched_person:
-                        person_counts[matched_person] = person_counts.get(matched_person, 0) + 1
+                    # all-faces 모드에서는 사진에 매칭된 사람마다 1씩 카운트
+                    names = {r["name"] for r in face_records if r["name"] != "unknown"} or {matched_person}
+                    for name in names:
+                        if name:
+                            person_counts[name] = person_counts.get(name, 0) + 1
 
                     progress_percent = done_count / total_files * 100
                     self.results_queue.put({
                         "progress_percent": progress_percent,
                         "thumbnail": thumb,
+                        "face_records": face_records,
                         "person_counts": None
                     })
                     self._log_memory_usage(f"Completed {file}")
@@ -254,6 +429,7 @@ class FaceRecognitionEngine:
 
         except Exception as e:
             logger.exception("[process_images_in_background] Fatal error")
+            self.results_queue.put({"status": f"Processing failed: {e}"})
             self.results_queue.put({
                 "progress_percent": 100,
                 "thumbnail": None,
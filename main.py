@@ -1,16 +1,27 @@
 import threading
 import traceback
 import faulthandler
-import psutil
-import os
-import dlib
 
+# dlib / face_recognition / psutil은 여기서 import하지 않음
+# => 창을 먼저 띄우고 모델은 백그라운드에서 로드 (engine.get_models)
 from engine import FaceRecognitionEngine
 from ui import FaceRecognitionUI
 
 def thread_exception_handler(args):
     traceback.print_exception(args.exc_type, args.exc_value, args.exc_traceback)
 
+def warm_up_models(engine):
+    engine.results_queue.put({"status": "Loading models..."})
+    try:
+        models = engine.warm_up()
+    except Exception as e:
+        # 데몬 스레드에서는 예외가 조용히 사라지므로 UI에 알림
+        traceback.print_exc()
+        engine.results_queue.put({"status": f"Model load failed: {e}"})
+        return
+    print("DLIB use CUDA:", models["dlib_use_cuda"])
+    engine.results_queue.put({"status": "Models ready"})
+
 def main():
     log_file = open("faulthandler.log", "w", encoding="utf-8")
     faulthandler.enable(file=log_file)
@@ -18,10 +29,16 @@ def main():
     engine = FaceRecognitionEngine()
     ui = FaceRecognitionUI(engine)
 
+    # 이벤트 루프가 돌고 창이 그려진 뒤에 모델을 백그라운드에서 미리 로드
+    # (모델 로딩 중에는 GIL 때문에 메인 스레드가 창을 그리지 못할 수 있음)
+    ui.window.after(100, lambda: threading.Thread(target=warm_up_models, args=(engine,), daemon=True).start())
+
     # UI에서 "Start" 버튼 누르면 멀티스레드로 실행하는 로직이 있지만,
     # 임시로 아래처럼 단일 스레드로 직접 테스트해볼 수 있습니다:
     """
     import os
+    from engine import get_face_recognition
+    face_recognition = get_face_recognition()
     dataset = "D:/그냥/facerecog/datasets"
     output_base = "D:/그냥/facerecog/output"
     known_dir = "D:/그냥/facerecog/known_images"
@@ -51,7 +68,7 @@ def main():
     all_files = [f for f in os.listdir(dataset) if f.lower().endswith((".jpg", ".png", ".jpeg"))]
     person_counts = {}
     for i, f in enumerate(all_files, start=1):
-        file, matched_person, thumb = engine.process_single_image(
+        file, matched_person, thumb, face_records = engine.process_single_image(
             f, dataset, known_faces, known_names, output_base, output_path_unknown
         )
         if matched_person:
@@ -67,6 +84,5 @@ def main():
     ui.run()
 
 if __name__ == "__main__":
-    print("DLIB use CUDA:", dlib.DLIB_USE_CUDA)
     threading.excepthook = thread_exception_handler
     main()
@@ -17,6 +17,9 @@ class FaceRecognitionUI:
         self.output_var = tk.StringVar()
         self.known_var = tk.StringVar()
         self.threshold_var = tk.DoubleVar(value=0.45)
+        self.all_faces_var = tk.BooleanVar(value=False)
+        self.blur_unmatched_var = tk.BooleanVar(value=False)
+        self.link_files_var = tk.BooleanVar(value=False)
 
         # 위젯 구성
         self._build_widgets()
@@ -60,8 +63,26 @@ class FaceRecognitionUI:
         tk.Scale(self.window, from_=0, to=1, orient=tk.HORIZONTAL, resolution=0.01,
                  variable=self.threshold_var).grid(row=7, column=1, padx=5, pady=5)
 
+        # All faces : 단체사진의 모든 얼굴을 식별하여 각 사람의 output_group 폴더에 저장
+        tk.Checkbutton(self.window, text="Identify all faces", variable=self.all_faces_var,
+                       command=self._update_all_faces_options).grid(row=8, column=0, padx=5, pady=5, sticky="e")
+        # 아래 두 옵션은 all-faces 모드에서만 적용되므로, 체크되지 않았으면 비활성화
+        self.blur_unmatched_check = tk.Checkbutton(self.window, text="Blur unmatched faces (all faces)",
+                                                   variable=self.blur_unmatched_var)
+        self.blur_unmatched_check.grid(row=8, column=1, padx=5, pady=5, sticky="w")
+        # Link files : output_group에 복사 대신 하드링크 (실패 시 복사)
+        self.link_files_check = tk.Checkbutton(self.window, text="Link instead of copy (all faces)",
+                                               variable=self.link_files_var)
+        self.link_files_check.grid(row=8, column=2, padx=5, pady=5, sticky="w")
+        self._update_all_faces_options()
+
         # Start Button
-        tk.Button(self.window, text="Start", command=self._start_processing).grid(row=8, column=0, columnspan=3, pady=10)
+        tk.Button(self.window, text="Start", command=self._start_processing).grid(row=9, column=0, columnspan=3, pady=10)
+
+    def _update_all_faces_options(self):
+        state = tk.NORMAL if self.all_faces_var.get() else tk.DISABLED
+        self.blur_unmatched_check.config(state=state)
+        self.link_files_check.config(state=state)
 
     def _browse_dataset(self):
         folder = filedialog.askdirectory(title="Select Dataset Folder")
@@ -87,6 +108,8 @@ class FaceRecognitionUI:
 
         # Threshold 설정
         self.engine.set_threshold(self.threshold_var.get())
+        self.engine.set_identify_all_faces(self.all_faces_var.get(), self.blur_unmatched_var.get(),
+                                           self.link_files_var.get())
 
         # 별도 스레드에서 처리
         t = threading.Thread(
@@ -101,6 +124,12 @@ class FaceRecognitionUI:
             while True:
                 result = self.engine.results_queue.get_nowait()
 
+                # 모델 로딩 상태 (warm-up) 메시지
+                status = result.get("status")
+                if status is not None:
+                    self.window.title(f"Face Recognition GUI - {status}")
+                    continue
+
                 # 진행도
                 p = result.get("progress_percent", 0)
                 self.progress_label.config(text=f"Progress: {p:.2f}%")
@@ -113,6 +142,13 @@ class FaceRecognitionUI:
                     self.current_image_label.config(image=preview)
                     self.current_image_label.image = preview
 
+                # 현재 이미지의 얼굴별 결과 (이름 / 거리)
+                face_records = result.get("face_records")
+                if face_records:
+                    self.text_box.delete("1.0", tk.END)
+                    for i, record in enumerate(face_records, start=1):
+                        self.text_box.insert(tk.END, f"Face {i}: {record['name']} (dist={record['distance']:.3f})\n")
+
                 # 최종 person_counts가 있으면 text_box 업데이트
                 persons = result.get("person_counts")
                 if persons is not None: